@@ -0,0 +1 @@
+# Корневой conftest.py добавляет корень проекта в sys.path, чтобы тесты импортировали пакет src
@@ -1,11 +1,78 @@
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
 from loguru import logger
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler
+from telegram import Update
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, InlineQueryHandler, TypeHandler
 
-from src.handlers.commands import start_command, news_command, latest_command, callback_handler
+from src.handlers.commands import (
+    start_command, news_command, latest_command, country_command, language_command, callback_handler
+)
+from src.handlers.inline import inline_query_handler
+from src.utils.enrichment import ArticleEnricher
 from src.utils.logger import setup_logger
+from src.utils.prefetch import get_prefetcher
+from src.utils.recorder import TrafficRecorder
+
+
+async def start_background_tasks(application: Application) -> None:
+    """Запуск фоновой обработки статей и обновления кэша новостей после инициализации бота.
+    
+    Args:
+        application: Объект приложения бота
+    """
+    enrichment_interval = float(os.getenv("ENRICHMENT_INTERVAL", "300"))
+    enricher = ArticleEnricher()
+    
+    application.bot_data["enricher"] = enricher
+    application.bot_data["enrichment_task"] = asyncio.create_task(enricher.run_forever(enrichment_interval))
+    logger.info("Фоновая обработка статей запущена с интервалом {} с", enrichment_interval)
+    
+    prefetch_interval = float(os.getenv("PREFETCH_INTERVAL", "300"))
+    application.bot_data["prefetch_task"] = asyncio.create_task(get_prefetcher().run_forever(prefetch_interval))
+    logger.info("Обновление кэша новостей запущено с интервалом {} с", prefetch_interval)
+
+
+async def stop_background_tasks(application: Application) -> None:
+    """Остановка фоновых задач при завершении работы бота.
+    
+    Args:
+        application: Объект приложения бота
+    """
+    for task_name in ("enrichment_task", "prefetch_task"):
+        task = application.bot_data.pop(task_name, None)
+        if task:
+            task.cancel()
+        
+    enricher = application.bot_data.pop("enricher", None)
+    if enricher:
+        enricher.close()
+        
+    recorder = application.bot_data.pop("recorder", None)
+    if recorder:
+        recorder.close()
+
+
+def register_handlers(application: Application) -> None:
+    """Регистрация обработчиков команд и запросов бота.
+    
+    Args:
+        application: Объект приложения бота
+    """
+    # Регистрация обработчиков команд
+    application.add_handler(CommandHandler("start", start_command))
+    application.add_handler(CommandHandler("news", news_command))
+    application.add_handler(CommandHandler("latest", latest_command))
+    application.add_handler(CommandHandler("country", country_command))
+    application.add_handler(CommandHandler("language", language_command))
+    
+    # Регистрация обработчика callback-запросов
+    application.add_handler(CallbackQueryHandler(callback_handler))
+    
+    # Регистрация обработчика инлайн-запросов. Обработчик не блокирует очередь
+    # обновлений, чтобы новый запрос пользователя мог отменить устаревший
+    application.add_handler(InlineQueryHandler(inline_query_handler, block=False))
 
 
 def main() -> None:
@@ -34,15 +101,27 @@ def main() -> None:
     
     # Инициализация бота
     logger.info("Инициализация бота NewsPulseBot")
-    application = Application.builder().token(token).build()
+    application = (
+        Application.builder()
+        .token(token)
+        .post_init(start_background_tasks)
+        .post_shutdown(stop_background_tasks)
+        .build()
+    )
     
-    # Регистрация обработчиков команд
-    application.add_handler(CommandHandler("start", start_command))
-    application.add_handler(CommandHandler("news", news_command))
-    application.add_handler(CommandHandler("latest", latest_command))
+    register_handlers(application)
     
-    # Регистрация обработчика callback-запросов
-    application.add_handler(CallbackQueryHandler(callback_handler))
+    # Запись трафика для последующего воспроизведения (python -m src.utils.replay)
+    record_path = os.getenv("TRAFFIC_RECORD_PATH")
+    if record_path:
+        recorder = TrafficRecorder(
+            record_path,
+            record_inline_queries=os.getenv("TRAFFIC_RECORD_INLINE_QUERIES", "0") == "1"
+        )
+        recorder.install()
+        application.bot_data["recorder"] = recorder
+        application.add_handler(TypeHandler(Update, recorder.record_update_callback), group=-1)
+        logger.info("Запись трафика включена: {}", recorder.path)
     
     # Запуск бота
     logger.info("Запуск бота NewsPulseBot")
@@ -1,21 +1,25 @@
 import sqlite3
 import os
+import re
 from typing import Dict, List, Optional, Tuple, Any
 import asyncio
 from loguru import logger
 
+from src.utils.news_api import Article, DEFAULT_COUNTRY, DEFAULT_LANGUAGE
+
 
 class Database:
     """Класс для работы с базой данных SQLite."""
     
-    def __init__(self, db_path: str = "data/newspulsebot.db"):
+    def __init__(self, db_path: Optional[str] = None):
         """Инициализация базы данных.
         
         Args:
-            db_path: Путь к файлу базы данных
+            db_path: Путь к файлу базы данных. Если не указан, берется из переменной
+                окружения DATABASE_PATH или используется data/newspulsebot.db
         """
-        self.db_path = db_path
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path or os.getenv("DATABASE_PATH", "data/newspulsebot.db")
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
         self._init_db()
         
     def _init_db(self) -> None:
@@ -41,10 +45,91 @@ class Database:
                 favorite_category TEXT,
                 last_command TEXT,
                 language TEXT DEFAULT 'ru',
+                country TEXT DEFAULT 'ru',
                 FOREIGN KEY (user_id) REFERENCES users (user_id)
             )
             ''')
             
+            self._add_missing_columns(cursor, "user_preferences", {
+                "country": "TEXT DEFAULT 'ru'",
+            })
+            
+            # Локальное хранилище статей, из которого отвечают инлайн-запросы.
+            # Явный id нужен полнотекстовому индексу: неявный rowid может измениться после VACUUM
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                description TEXT,
+                source TEXT,
+                author TEXT,
+                published_at TEXT,
+                category TEXT,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                summary TEXT,
+                enrichment_attempts INTEGER NOT NULL DEFAULT 0,
+                enriched_at TIMESTAMP
+            )
+            ''')
+            
+            # Разделы (страна, язык), в которых статья была получена. Статья может
+            # входить в несколько разделов, поэтому они хранятся отдельно от нее
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_partitions (
+                article_id INTEGER NOT NULL,
+                country TEXT NOT NULL,
+                language TEXT NOT NULL,
+                PRIMARY KEY (article_id, country, language),
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            ) WITHOUT ROWID
+            ''')
+            
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_partitions_locale
+            ON article_partitions (country, language)
+            ''')
+            
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_articles_published_at
+            ON articles (published_at)
+            ''')
+            
+            # Полнотекстовый индекс по заголовку и описанию статей
+            cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title,
+                description,
+                content='articles',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            ''')
+            
+            # Триггеры для синхронизации полнотекстового индекса с таблицей статей
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            ''')
+            
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+            ''')
+            
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO articles_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            ''')
+            
             conn.commit()
             logger.info("База данных инициализирована успешно")
         except Exception as e:
@@ -53,6 +138,22 @@ class Database:
         finally:
             conn.close()
     
+    def _add_missing_columns(self, cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]) -> None:
+        """Добавление в существующую таблицу колонок, появившихся в новых версиях.
+        
+        Args:
+            cursor: Курсор открытого соединения
+            table: Имя таблицы
+            columns: Словарь имя колонки -> определение
+        """
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+        
+        for column, definition in columns.items():
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info("В таблицу {} добавлена колонка {}", table, column)
+    
     def _get_connection(self) -> sqlite3.Connection:
         """Получение соединения с базой данных.
         
@@ -90,6 +191,35 @@ class Database:
         finally:
             conn.close()
     
+    async def execute_many(self, query: str, params_list: List[Tuple]) -> None:
+        """Асинхронное выполнение запроса для набора параметров.
+        
+        Args:
+            query: SQL-запрос
+            params_list: Список наборов параметров запроса
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._execute_many, query, params_list)
+    
+    def _execute_many(self, query: str, params_list: List[Tuple]) -> None:
+        """Синхронное выполнение запроса для набора параметров в одной транзакции.
+        
+        Args:
+            query: SQL-запрос
+            params_list: Список наборов параметров запроса
+        """
+        conn = self._get_connection()
+        
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
+        except Exception as e:
+            logger.error("Ошибка при выполнении запроса: {} - {}", query, str(e))
+            raise
+        finally:
+            conn.close()
+    
     async def fetch_one(self, query: str, params: Tuple = ()) -> Optional[Dict[str, Any]]:
         """Асинхронное выполнение запроса с возвратом одной строки.
         
@@ -211,7 +341,8 @@ class Database:
         )
         
     async def update_user_preference(self, user_id: int, favorite_category: Optional[str] = None, 
-                                    last_command: Optional[str] = None, language: Optional[str] = None) -> None:
+                                    last_command: Optional[str] = None, language: Optional[str] = None,
+                                    country: Optional[str] = None) -> None:
         """Обновление предпочтений пользователя.
         
         Args:
@@ -219,6 +350,7 @@ class Database:
             favorite_category: Любимая категория новостей
             last_command: Последняя выполненная команда
             language: Предпочитаемый язык
+            country: Предпочитаемая страна
         """
         # Собираем только те поля, которые нужно обновить
         update_fields = []
@@ -236,6 +368,10 @@ class Database:
             update_fields.append("language = ?")
             params.append(language)
             
+        if country is not None:
+            update_fields.append("country = ?")
+            params.append(country)
+            
         if not update_fields:
             return
             
@@ -260,4 +396,189 @@ class Database:
         return await self.fetch_one(
             "SELECT * FROM user_preferences WHERE user_id = ?",
             (user_id,)
-        ) 
\ No newline at end of file
+        )
+        
+    async def save_articles(self, articles: List[Article], category: Optional[str] = None,
+                            country: str = DEFAULT_COUNTRY, language: str = DEFAULT_LANGUAGE) -> None:
+        """Сохранение статей в локальное хранилище.
+        
+        Args:
+            articles: Список статей
+            category: Категория, в которой были получены статьи
+            country: Код страны, для которой были получены статьи
+            language: Код языка статей
+        """
+        stored_articles = [article for article in articles if article.url and article.title]
+        if not stored_articles:
+            return
+            
+        await self.execute_many(
+            """
+            INSERT INTO articles (url, title, description, source, author, published_at, category)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = excluded.title,
+                description = excluded.description,
+                source = excluded.source,
+                author = excluded.author,
+                published_at = excluded.published_at,
+                category = COALESCE(excluded.category, articles.category),
+                fetched_at = CURRENT_TIMESTAMP
+            """,
+            [
+                (
+                    article.url,
+                    article.title,
+                    article.description,
+                    article.source,
+                    article.author,
+                    article.published_at,
+                    category
+                )
+                for article in stored_articles
+            ]
+        )
+        
+        # Раздел добавляется к статье, а не перезаписывает разделы, в которых она уже есть
+        await self.execute_many(
+            """
+            INSERT OR IGNORE INTO article_partitions (article_id, country, language)
+            SELECT id, ?, ? FROM articles WHERE url = ?
+            """,
+            [(country, language, article.url) for article in stored_articles]
+        )
+        
+    async def search_articles(self, query: str, limit: int = 20, country: Optional[str] = None,
+                              language: Optional[str] = None) -> List[Article]:
+        """Поиск статей в локальном хранилище по префиксам слов.
+        
+        Args:
+            query: Поисковый запрос. Пустой запрос возвращает самые свежие статьи
+            limit: Максимальное количество статей
+            country: Код страны для ограничения поиска
+            language: Код языка для ограничения поиска
+            
+        Returns:
+            Список статей, отсортированных по дате публикации
+        """
+        conditions = []
+        params: List[Any] = []
+        
+        match_expression = self._build_match_expression(query)
+        if match_expression:
+            conditions.append("a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)")
+            params.append(match_expression)
+            
+        partition_conditions = []
+        
+        if country is not None:
+            partition_conditions.append("p.country = ?")
+            params.append(country)
+            
+        if language is not None:
+            partition_conditions.append("p.language = ?")
+            params.append(language)
+            
+        if partition_conditions:
+            conditions.append(
+                "a.id IN (SELECT p.article_id FROM article_partitions p "
+                f"WHERE {' AND '.join(partition_conditions)})"
+            )
+            
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        
+        rows = await self.fetch_all(
+            f"SELECT a.* FROM articles a {where_clause} ORDER BY a.published_at DESC LIMIT ?",
+            tuple(params)
+        )
+            
+        return [
+            Article(
+                source=row["source"] or "Неизвестный источник",
+                author=row["author"],
+                title=row["title"],
+                description=row["description"],
+                url=row["url"],
+                published_at=row["published_at"] or "",
+                summary=row["summary"]
+            )
+            for row in rows
+        ]
+        
+    async def get_article_summaries(self, urls: List[str]) -> Dict[str, str]:
+        """Получение предварительно вычисленных кратких содержаний статей.
+        
+        Args:
+            urls: Список URL статей
+            
+        Returns:
+            Словарь URL -> краткое содержание для статей, у которых оно есть
+        """
+        if not urls:
+            return {}
+            
+        placeholders = ", ".join("?" for _ in urls)
+        rows = await self.fetch_all(
+            f"SELECT url, summary FROM articles WHERE summary IS NOT NULL AND url IN ({placeholders})",
+            tuple(urls)
+        )
+        
+        return {row["url"]: row["summary"] for row in rows}
+        
+    async def get_articles_for_enrichment(self, limit: int = 20, max_attempts: int = 3,
+                                          retry_delay: float = 3600.0) -> List[str]:
+        """Получение статей, для которых еще не вычислено краткое содержание.
+        
+        Args:
+            limit: Максимальное количество статей
+            max_attempts: Максимальное количество попыток обработки статьи
+            retry_delay: Минимальная пауза после неудачной попытки в секундах
+            
+        Returns:
+            Список URL статей, начиная с самых новых
+        """
+        rows = await self.fetch_all(
+            """
+            SELECT url FROM articles
+            WHERE summary IS NULL AND enrichment_attempts < ?
+                AND (enriched_at IS NULL OR enriched_at <= datetime('now', ?))
+            ORDER BY fetched_at DESC
+            LIMIT ?
+            """,
+            (max_attempts, f"-{int(retry_delay)} seconds", limit)
+        )
+        
+        return [row["url"] for row in rows]
+        
+    async def save_article_summary(self, url: str, summary: Optional[str]) -> None:
+        """Сохранение результата обработки статьи.
+        
+        Args:
+            url: URL статьи
+            summary: Краткое содержание или None, если его не удалось получить
+        """
+        await self.execute(
+            """
+            UPDATE articles
+            SET summary = ?,
+                enrichment_attempts = enrichment_attempts + 1,
+                enriched_at = CURRENT_TIMESTAMP
+            WHERE url = ?
+            """,
+            (summary, url)
+        )
+        
+    @staticmethod
+    def _build_match_expression(query: str) -> str:
+        """Построение FTS5-выражения для поиска по префиксам слов запроса.
+        
+        Args:
+            query: Поисковый запрос пользователя
+            
+        Returns:
+            Выражение для оператора MATCH или пустая строка
+        """
+        # Оставляем только слова, чтобы пользовательский ввод не попал в синтаксис FTS5
+        terms = re.findall(r"\w+", query.lower())
+        return " ".join(f'"{term}"*' for term in terms)
@@ -1,10 +1,12 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
 from loguru import logger
 
 from src.database.db import Database
-from src.utils.news_api import NewsAPIClient, Article
+from src.utils.news_api import Article, DEFAULT_COUNTRY, DEFAULT_LANGUAGE
+from src.utils.prefetch import get_prefetcher
 
 
 # Доступные категории новостей
@@ -17,6 +19,59 @@ CATEGORIES = {
     "technology": "Технологии"
 }
 
+# Доступные страны новостей
+COUNTRIES = {
+    "ru": "Россия",
+    "ua": "Украина",
+    "us": "США",
+    "gb": "Великобритания",
+    "de": "Германия",
+    "fr": "Франция"
+}
+
+# Доступные языки новостей
+LANGUAGES = {
+    "ru": "Русский",
+    "en": "Английский",
+    "de": "Немецкий",
+    "fr": "Французский",
+    "es": "Испанский",
+    "it": "Итальянский"
+}
+
+
+def markdown_link(title: str, url: str) -> str:
+    """Построение ссылки в разметке Markdown.
+    
+    Args:
+        title: Текст ссылки
+        url: Адрес ссылки
+        
+    Returns:
+        Ссылка с экранированным текстом и адресом
+    """
+    # Один неэкранированный символ разметки ломает отправку всего сообщения,
+    # а скобка в адресе завершает ссылку раньше времени
+    return f"[{escape_markdown(title)}]({url.replace(')', '%29')})"
+
+
+def get_user_locale(user_prefs: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """Получение страны и языка новостей из предпочтений пользователя.
+    
+    Args:
+        user_prefs: Словарь с предпочтениями пользователя или None
+        
+    Returns:
+        Кортеж (код страны, код языка)
+    """
+    if not user_prefs:
+        return DEFAULT_COUNTRY, DEFAULT_LANGUAGE
+    
+    return (
+        user_prefs.get("country") or DEFAULT_COUNTRY,
+        user_prefs.get("language") or DEFAULT_LANGUAGE
+    )
+
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик команды /start."""
@@ -47,7 +102,9 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         "Доступные команды:\n"
         "/start — начать работу с ботом\n"
         "/news — получить последние новости\n"
-        "/latest [категория] — получить новости по категории\n\n"
+        "/latest [категория] — получить новости по категории\n"
+        "/country [код] — выбрать страну новостей\n"
+        "/language [код] — выбрать язык новостей\n\n"
         "Выберите действие:",
         reply_markup=reply_markup
     )
@@ -65,19 +122,20 @@ async def news_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     # Получаем предпочитаемую категорию пользователя
     user_prefs = await db.get_user_preferences(user.id)
     favorite_category = user_prefs.get("favorite_category") if user_prefs else None
+    country, language = get_user_locale(user_prefs)
     
     await update.message.reply_text("🔍 Ищу последние новости...")
     
-    news_api = NewsAPIClient()
     try:
+        articles = await get_prefetcher().get_headlines(country, language, favorite_category)
+        
         if favorite_category:
-            articles = await news_api.get_top_headlines(category=favorite_category)
             category_name = CATEGORIES.get(favorite_category, favorite_category)
             intro_text = f"📰 Последние новости из категории '{category_name}':\n\n"
         else:
-            articles = await news_api.get_top_headlines()
             intro_text = "📰 Последние главные новости:\n\n"
         
+        await attach_summaries(db, articles)
         await send_articles(update, articles, intro_text)
     except Exception as e:
         logger.error(f"Ошибка при получении новостей: {str(e)}")
@@ -114,11 +172,13 @@ async def latest_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         favorite_category=category
     )
     
+    user_prefs = await db.get_user_preferences(user.id)
+    country, language = get_user_locale(user_prefs)
+    
     await update.message.reply_text(f"🔍 Ищу последние новости{f' по категории {CATEGORIES.get(category, category)}' if category else ''}...")
     
-    news_api = NewsAPIClient()
     try:
-        articles = await news_api.get_top_headlines(category=category)
+        articles = await get_prefetcher().get_headlines(country, language, category)
         
         if category:
             category_name = CATEGORIES.get(category, category)
@@ -126,6 +186,7 @@ async def latest_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         else:
             intro_text = "📰 Последние главные новости:\n\n"
         
+        await attach_summaries(db, articles)
         await send_articles(update, articles, intro_text)
     except Exception as e:
         logger.error(f"Ошибка при получении новостей: {str(e)}")
@@ -134,6 +195,95 @@ async def latest_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         )
 
 
+async def country_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработчик команды /country [код страны]."""
+    user = update.effective_user
+    
+    db = Database()
+    args = context.args
+    
+    if not args:
+        user_prefs = await db.get_user_preferences(user.id)
+        country, _ = get_user_locale(user_prefs)
+        countries_text = ", ".join([f"{k} ({v})" for k, v in COUNTRIES.items()])
+        await update.message.reply_text(
+            f"🌍 Текущая страна новостей: {COUNTRIES.get(country, country)}\n\n"
+            f"Доступные страны: {countries_text}\n\n"
+            f"Пример: /country us"
+        )
+        return
+    
+    country = args[0].lower()
+    
+    if country not in COUNTRIES:
+        countries_text = ", ".join([f"{k} ({v})" for k, v in COUNTRIES.items()])
+        await update.message.reply_text(
+            f"❌ Указана неверная страна.\n\n"
+            f"Доступные страны: {countries_text}\n\n"
+            f"Пример: /country us"
+        )
+        return
+    
+    logger.info(f"Пользователь {user.id} выбрал страну новостей: {country}")
+    
+    await db.update_user_preference(user_id=user.id, country=country)
+    await update.message.reply_text(f"✅ Страна новостей: {COUNTRIES[country]}")
+
+
+async def language_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработчик команды /language [код языка]."""
+    user = update.effective_user
+    
+    db = Database()
+    args = context.args
+    
+    if not args:
+        user_prefs = await db.get_user_preferences(user.id)
+        _, language = get_user_locale(user_prefs)
+        languages_text = ", ".join([f"{k} ({v})" for k, v in LANGUAGES.items()])
+        await update.message.reply_text(
+            f"🗣️ Текущий язык новостей: {LANGUAGES.get(language, language)}\n\n"
+            f"Доступные языки: {languages_text}\n\n"
+            f"Пример: /language en"
+        )
+        return
+    
+    language = args[0].lower()
+    
+    if language not in LANGUAGES:
+        languages_text = ", ".join([f"{k} ({v})" for k, v in LANGUAGES.items()])
+        await update.message.reply_text(
+            f"❌ Указан неверный язык.\n\n"
+            f"Доступные языки: {languages_text}\n\n"
+            f"Пример: /language en"
+        )
+        return
+    
+    logger.info(f"Пользователь {user.id} выбрал язык новостей: {language}")
+    
+    await db.update_user_preference(user_id=user.id, language=language)
+    await update.message.reply_text(f"✅ Язык новостей: {LANGUAGES[language]}")
+
+
+async def attach_summaries(db: Database, articles: List[Article]) -> None:
+    """Подстановка кратких содержаний, заранее вычисленных фоновой обработкой.
+    
+    Ошибка работы с хранилищем не должна мешать отправке новостей пользователю.
+    
+    Args:
+        db: Объект базы данных
+        articles: Список статей
+    """
+    try:
+        summaries = await db.get_article_summaries([article.url for article in articles])
+    except Exception as e:
+        logger.warning(f"Не удалось получить краткие содержания статей: {str(e)}")
+        return
+    
+    for article in articles:
+        article.summary = summaries.get(article.url, article.summary)
+
+
 async def send_articles(update: Update, articles: List[Article], intro_text: str) -> None:
     """Отправка списка статей пользователю.
     
@@ -149,10 +299,22 @@ async def send_articles(update: Update, articles: List[Article], intro_text: str
     message_text = intro_text
     
     for i, article in enumerate(articles, 1):
+        # Краткое содержание вычисляется заранее, поэтому выводится целиком
+        if article.summary:
+            description = article.summary
+        elif article.description and len(article.description) > 100:
+            description = article.description[:100] + '...'
+        else:
+            description = article.description or 'Описание отсутствует'
+        
+        # Краткие содержания и описания содержат произвольный текст со страниц,
+        # а один лишний символ разметки ломает отправку всего сообщения
+        description = escape_markdown(description)
+        
         message_text += (
-            f"{i}. [{article.title}]({article.url})\n"
-            f"   🗞️ {article.source}\n"
-            f"   📝 {article.description[:100] + '...' if article.description and len(article.description) > 100 else article.description or 'Описание отсутствует'}\n\n"
+            f"{i}. {markdown_link(article.title, article.url)}\n"
+            f"   🗞️ {escape_markdown(article.source)}\n"
+            f"   📝 {description}\n\n"
         )
     
     # Добавляем кнопки для действий
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+from typing import Dict, Optional, Tuple
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
+from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
+from loguru import logger
+
+from src.database.db import Database
+from src.handlers.commands import get_user_locale, markdown_link
+from src.utils.cache import TTLCache
+from src.utils.news_api import Article
+
+
+# Максимальное количество результатов в ответе на инлайн-запрос
+INLINE_RESULTS_LIMIT = 20
+
+# Время кэширования ответа на стороне Telegram (в секундах)
+INLINE_CACHE_TIME = 60
+
+# Кэш результатов поиска по (стране, языку, нормализованному тексту запроса)
+_results_cache = TTLCache(maxsize=2048, ttl=60)
+
+# Текущая задача обработки инлайн-запроса для каждого пользователя
+_pending_queries: Dict[int, asyncio.Task] = {}
+
+_db: Optional[Database] = None
+
+
+def _get_db() -> Database:
+    """Получение общего объекта базы данных для инлайн-запросов.
+
+    Инлайн-запросы приходят на каждое нажатие клавиши, поэтому база
+    инициализируется один раз, а не при каждом запросе.
+
+    Returns:
+        Объект базы данных
+    """
+    global _db
+    if _db is None:
+        _db = Database()
+    return _db
+
+
+async def _get_user_locale(user_id: int) -> Tuple[str, str]:
+    """Получение страны и языка новостей пользователя.
+
+    Предпочтения читаются при каждом запросе (это один запрос по первичному
+    ключу), чтобы смена страны или языка сразу влияла на инлайн-поиск.
+
+    Args:
+        user_id: ID пользователя в Telegram
+
+    Returns:
+        Кортеж (код страны, код языка)
+    """
+    user_prefs = await _get_db().get_user_preferences(user_id)
+    return get_user_locale(user_prefs)
+
+
+async def inline_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Обработчик инлайн-запросов `@bot <запрос>`.
+
+    Отвечает только из локального хранилища статей, без обращений к NewsAPI.
+    Устаревший запрос пользователя отменяется, когда от него приходит новый.
+    """
+    inline_query = update.inline_query
+    user_id = inline_query.from_user.id
+    query_text = " ".join(inline_query.query.lower().split())
+
+    # Отменяем предыдущий запрос пользователя, если он еще обрабатывается
+    current_task = asyncio.current_task()
+    previous_task = _pending_queries.get(user_id)
+    if previous_task is not None and previous_task is not current_task and not previous_task.done():
+        previous_task.cancel()
+    _pending_queries[user_id] = current_task
+
+    try:
+        country, language = await _get_user_locale(user_id)
+        cache_key = (country, language, query_text)
+        results = _results_cache.get(cache_key)
+
+        if results is None:
+            articles = await _get_db().search_articles(
+                query_text, limit=INLINE_RESULTS_LIMIT, country=country, language=language
+            )
+            results = [build_inline_result(article) for article in articles]
+            _results_cache.set(cache_key, results)
+
+        # Результаты зависят от страны и языка пользователя
+        await inline_query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=True)
+    except Exception as e:
+        logger.error(f"Ошибка при обработке инлайн-запроса '{query_text}': {str(e)}")
+    finally:
+        if _pending_queries.get(user_id) is current_task:
+            del _pending_queries[user_id]
+
+
+def build_inline_result(article: Article) -> InlineQueryResultArticle:
+    """Преобразование статьи в результат инлайн-запроса.
+
+    Args:
+        article: Новостная статья
+
+    Returns:
+        Результат инлайн-запроса
+    """
+    description = article.summary or article.description or "Описание отсутствует"
+
+    return InlineQueryResultArticle(
+        id=hashlib.md5(article.url.encode("utf-8")).hexdigest(),
+        title=article.title,
+        description=f"🗞️ {article.source} — {description[:100]}",
+        url=article.url,
+        input_message_content=InputTextMessageContent(
+            f"{markdown_link(article.title, article.url)}\n🗞️ {escape_markdown(article.source)}",
+            parse_mode="Markdown",
+            disable_web_page_preview=True
+        )
+    )
@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Простой LRU-кэш в памяти с ограниченным временем жизни записей."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        """Инициализация кэша.
+
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Получение значения из кэша.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Сохраненное значение или None, если запись отсутствует или устарела
+        """
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранение значения в кэш.
+
+        Args:
+            key: Ключ записи
+            value: Сохраняемое значение
+        """
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        # Вытесняем самые давно использованные записи
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очистка кэша."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
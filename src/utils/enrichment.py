@@ -0,0 +1,280 @@
+import asyncio
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import aiohttp
+from loguru import logger
+
+from src.database.db import Database
+
+
+# Максимальная длина краткого содержания статьи
+SUMMARY_MAX_CHARS = 300
+
+# Максимальный размер загружаемой страницы (в байтах)
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Размер блока при чтении страницы (в байтах)
+READ_CHUNK_BYTES = 64 * 1024
+
+# Теги, текст внутри которых не относится к содержимому статьи
+_SKIPPED_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg"}
+
+
+class _ArticleTextParser(HTMLParser):
+    """Парсер HTML, собирающий текст абзацев и мета-описание страницы."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self.meta_description: Optional[str] = None
+        self._skip_depth = 0
+        self._paragraph: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "p" and not self._skip_depth:
+            self._paragraph = []
+        elif tag == "meta" and not self.meta_description:
+            attributes = dict(attrs)
+            if attributes.get("name") == "description" or attributes.get("property") == "og:description":
+                self.meta_description = attributes.get("content")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "p" and self._paragraph is not None:
+            text = " ".join("".join(self._paragraph).split())
+            if text:
+                self.paragraphs.append(text)
+            self._paragraph = None
+
+    def handle_data(self, data):
+        if self._paragraph is not None and not self._skip_depth:
+            self._paragraph.append(data)
+
+
+def extract_summary(html: str, max_sentences: int = 3, max_chars: int = SUMMARY_MAX_CHARS) -> Optional[str]:
+    """Извлечение текста статьи из HTML и построение экстрактивного краткого содержания.
+
+    Предложения оцениваются по средней частоте входящих в них слов, лучшие
+    возвращаются в исходном порядке. Функция выполняется в пуле процессов.
+
+    Args:
+        html: HTML-код страницы
+        max_sentences: Максимальное количество предложений
+        max_chars: Максимальная длина краткого содержания
+
+    Returns:
+        Краткое содержание или None, если текст извлечь не удалось
+    """
+    parser = _ArticleTextParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        return None
+
+    text = " ".join(parser.paragraphs)
+    sentences = [
+        sentence.strip()
+        for sentence in re.split(r"(?<=[.!?…])\s+", text)
+        if len(sentence.split()) >= 5
+    ]
+
+    if not sentences:
+        meta = " ".join((parser.meta_description or "").split())
+        return _truncate(meta, max_chars) if meta else None
+
+    # Короткие слова (предлоги, союзы) не учитываем при оценке
+    def content_words(sentence: str) -> List[str]:
+        return [word for word in re.findall(r"\w+", sentence.lower()) if len(word) > 3]
+
+    frequencies = Counter(word for sentence in sentences for word in content_words(sentence))
+
+    def score(sentence: str) -> float:
+        words = content_words(sentence)
+        return sum(frequencies[word] for word in words) / len(words) if words else 0.0
+
+    ranked = sorted(range(len(sentences)), key=lambda i: score(sentences[i]), reverse=True)
+    selected = sorted(ranked[:max_sentences])
+
+    return _truncate(" ".join(sentences[i] for i in selected), max_chars)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Обрезка текста по границе слова."""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0].rstrip(",;:") + "..."
+
+
+class _DomainRateLimiter:
+    """Ограничитель частоты запросов к одному домену."""
+
+    def __init__(self, interval: float):
+        """Инициализация ограничителя.
+
+        Args:
+            interval: Минимальный интервал между запросами к одному домену в секундах
+        """
+        self.interval = interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_request: Dict[str, float] = {}
+
+    async def wait(self, domain: str) -> None:
+        """Ожидание, пока к домену снова можно обратиться.
+
+        Args:
+            domain: Доменное имя
+        """
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            delay = self._last_request.get(domain, 0.0) + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_request[domain] = time.monotonic()
+
+
+class ArticleEnricher:
+    """Фоновая обработка сохраненных статей: загрузка страниц и вычисление кратких содержаний.
+
+    Состояние обработки хранится в базе данных, поэтому после перезапуска
+    обработка продолжается с необработанных статей.
+    """
+
+    def __init__(
+        self,
+        db: Optional[Database] = None,
+        batch_size: int = 20,
+        concurrency: int = 5,
+        domain_interval: float = 2.0,
+        timeout: float = 15.0,
+        max_attempts: int = 3,
+        retry_delay: float = 3600.0,
+        max_workers: Optional[int] = None
+    ):
+        """Инициализация обработчика.
+
+        Args:
+            db: Объект базы данных
+            batch_size: Количество статей, обрабатываемых за один проход
+            concurrency: Максимальное количество одновременных загрузок
+            domain_interval: Минимальный интервал между запросами к одному домену в секундах
+            timeout: Таймаут загрузки страницы в секундах
+            max_attempts: Максимальное количество попыток обработки статьи
+            retry_delay: Минимальная пауза перед повторной попыткой обработки статьи в секундах
+            max_workers: Количество процессов для разбора страниц
+        """
+        self.db = db or Database()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._rate_limiter = _DomainRateLimiter(domain_interval)
+        self._executor = ProcessPoolExecutor(max_workers=max_workers or min(2, os.cpu_count() or 1))
+
+    async def run_once(self) -> int:
+        """Обработка одной партии необработанных статей.
+
+        Returns:
+            Количество статей, для которых получено краткое содержание
+        """
+        urls = await self.db.get_articles_for_enrichment(
+            limit=self.batch_size, max_attempts=self.max_attempts, retry_delay=self.retry_delay
+        )
+        if not urls:
+            return 0
+
+        logger.debug("Обработка партии статей: {}", len(urls))
+
+        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+            results = await asyncio.gather(*(self._enrich(session, url) for url in urls))
+
+        enriched = sum(results)
+        logger.info("Краткое содержание получено для {} из {} статей", enriched, len(urls))
+        return enriched
+
+    async def run_forever(self, interval: float = 300.0) -> None:
+        """Периодическая обработка статей до отмены задачи.
+
+        Args:
+            interval: Пауза между проходами в секундах, если необработанных статей нет
+        """
+        while True:
+            try:
+                enriched = await self.run_once()
+            except Exception as e:
+                logger.error("Ошибка при обработке статей: {}", str(e))
+                enriched = 0
+
+            # Если партия была обработана, сразу берем следующую
+            if not enriched:
+                await asyncio.sleep(interval)
+
+    def close(self) -> None:
+        """Остановка пула процессов."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _enrich(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """Загрузка и обработка одной статьи.
+
+        Args:
+            session: HTTP-сессия
+            url: URL статьи
+
+        Returns:
+            True, если краткое содержание получено
+        """
+        summary = None
+
+        try:
+            html = await self._fetch(session, url)
+            if html:
+                loop = asyncio.get_running_loop()
+                summary = await loop.run_in_executor(self._executor, extract_summary, html)
+        except Exception as e:
+            logger.warning("Не удалось обработать статью {}: {}", url, str(e))
+
+        await self.db.save_article_summary(url, summary)
+        return summary is not None
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Загрузка HTML-страницы с учетом ограничений на частоту и размер.
+
+        Args:
+            session: HTTP-сессия
+            url: URL страницы
+
+        Returns:
+            HTML-код страницы или None
+        """
+        async with self._semaphore:
+            # Интервал отсчитывается от фактической отправки запроса, поэтому ждем уже со слотом:
+            # иначе запросы, дождавшиеся своей очереди у семафора, уходили бы к домену разом
+            await self._rate_limiter.wait(urlparse(url).netloc)
+
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logger.debug("Страница {} вернула статус {}", url, response.status)
+                    return None
+
+                if "html" not in response.headers.get("Content-Type", ""):
+                    return None
+
+                # content.read(n) возвращает только уже полученные данные, поэтому читаем до конца
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(READ_CHUNK_BYTES):
+                    body.extend(chunk)
+                    if len(body) >= MAX_PAGE_BYTES:
+                        del body[MAX_PAGE_BYTES:]
+                        break
+
+                return body.decode(response.charset or "utf-8", errors="replace")
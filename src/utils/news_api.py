@@ -1,10 +1,33 @@
 import os
+from contextvars import ContextVar
 from typing import Dict, List, Optional, Any
 import aiohttp
 from loguru import logger
 from pydantic import BaseModel
 
 
+# Страна и язык новостей по умолчанию
+DEFAULT_COUNTRY = "ru"
+DEFAULT_LANGUAGE = "ru"
+
+# Основной язык главных новостей страны. top-headlines не фильтрует по языку,
+# поэтому новости страны на другом языке запрашиваются через ее источники
+COUNTRY_LANGUAGES = {
+    "ru": "ru",
+    "ua": "uk",
+    "us": "en",
+    "gb": "en",
+    "de": "de",
+    "fr": "fr"
+}
+
+# Максимальное количество источников в одном запросе top-headlines
+MAX_SOURCES = 20
+
+# Признак фонового запроса к NewsAPI, выполняемого не по запросу пользователя
+background_request: ContextVar[bool] = ContextVar("background_request", default=False)
+
+
 class Article(BaseModel):
     """Модель для представления новостной статьи."""
     source: str
@@ -13,6 +36,7 @@ class Article(BaseModel):
     description: Optional[str] = None
     url: str
     published_at: str
+    summary: Optional[str] = None
     
 
 class NewsAPIClient:
@@ -33,8 +57,9 @@ class NewsAPIClient:
     async def get_top_headlines(
         self, 
         category: Optional[str] = None, 
-        country: str = "ru", 
-        page_size: int = 5
+        country: str = DEFAULT_COUNTRY, 
+        page_size: int = 5,
+        sources: Optional[List[str]] = None
     ) -> List[Article]:
         """Получение главных новостей.
         
@@ -42,18 +67,23 @@ class NewsAPIClient:
             category: Категория новостей (бизнес, развлечения, здоровье, наука, спорт, технологии)
             country: Код страны (по умолчанию - Россия)
             page_size: Количество новостей
+            sources: Идентификаторы источников. NewsAPI не позволяет совмещать их
+                со страной и категорией, поэтому они в этом случае не передаются
             
         Returns:
             Список новостных статей
         """
         params = {
             "apiKey": self.api_key,
-            "country": country,
             "pageSize": page_size
         }
         
-        if category:
-            params["category"] = category
+        if sources:
+            params["sources"] = ",".join(sources[:MAX_SOURCES])
+        else:
+            params["country"] = country
+            if category:
+                params["category"] = category
             
         logger.debug("Запрос заголовков новостей: {}", params)
         
@@ -64,10 +94,44 @@ class NewsAPIClient:
             logger.error("Ошибка при получении заголовков новостей: {}", str(e))
             raise
     
+    async def get_sources(
+        self,
+        country: str,
+        language: str,
+        category: Optional[str] = None
+    ) -> List[str]:
+        """Получение идентификаторов источников страны на заданном языке.
+        
+        Args:
+            country: Код страны
+            language: Код языка
+            category: Категория новостей
+            
+        Returns:
+            Список идентификаторов источников
+        """
+        params = {
+            "apiKey": self.api_key,
+            "country": country,
+            "language": language
+        }
+        
+        if category:
+            params["category"] = category
+            
+        logger.debug("Запрос источников новостей: {}", params)
+        
+        try:
+            sources = await self._make_request("top-headlines/sources", params, result_key="sources")
+            return [source["id"] for source in sources if source.get("id")]
+        except Exception as e:
+            logger.error("Ошибка при получении источников новостей: {}", str(e))
+            raise
+    
     async def get_everything(
         self, 
         query: str, 
-        language: str = "ru", 
+        language: str = DEFAULT_LANGUAGE, 
         sort_by: str = "publishedAt", 
         page_size: int = 5
     ) -> List[Article]:
@@ -99,15 +163,21 @@ class NewsAPIClient:
             logger.error("Ошибка при поиске новостей: {}", str(e))
             raise
     
-    async def _make_request(self, endpoint: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _make_request(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        result_key: str = "articles"
+    ) -> List[Dict[str, Any]]:
         """Выполнение запроса к API.
         
         Args:
             endpoint: Конечная точка API
             params: Параметры запроса
+            result_key: Поле ответа со списком результатов
             
         Returns:
-            Список статей из ответа API
+            Список статей (или других объектов) из ответа API
         """
         url = f"{self.base_url}/{endpoint}"
         
@@ -124,7 +194,7 @@ class NewsAPIClient:
                     logger.error(f"Ошибка API: {data.get('message', 'Неизвестная ошибка')}")
                     raise Exception(f"API вернул ошибку: {data.get('message', 'Неизвестная ошибка')}")
                 
-                return data.get("articles", [])
+                return data.get(result_key, [])
     
     def _parse_articles(self, articles: List[Dict[str, Any]]) -> List[Article]:
         """Преобразование статей из API в модель Article.
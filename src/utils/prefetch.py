@@ -0,0 +1,235 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from loguru import logger
+
+from src.database.db import Database
+from src.utils.cache import TTLCache
+from src.utils.news_api import NewsAPIClient, Article, COUNTRY_LANGUAGES, background_request
+
+
+# Ключ раздела: (страна, язык, категория)
+PartitionKey = Tuple[str, str, Optional[str]]
+
+# Ключ запроса к NewsAPI: ("country", страна, категория) или ("sources", источник, ...)
+UpstreamKey = Tuple[Optional[str], ...]
+
+
+class HeadlinesPrefetcher:
+    """Кэш главных новостей для разделов (страна, язык, категория).
+
+    Новости страны на ее основном языке запрашиваются по стране, на другом
+    языке — по источникам этой страны на выбранном языке. Кэш ведется по
+    запросам к NewsAPI, поэтому одинаковые запросы разных разделов не повторяются.
+    Запоминает, какие разделы запрашивают пользователи, и в фоне обновляет
+    только их, чтобы ответы на команды не ждали NewsAPI.
+    """
+
+    def __init__(
+        self,
+        news_api: Optional[NewsAPIClient] = None,
+        db: Optional[Database] = None,
+        ttl: float = 900.0,
+        sources_ttl: float = 86400.0,
+        demand_window: float = 3600.0
+    ):
+        """Инициализация кэша.
+
+        Args:
+            news_api: Клиент NewsAPI. Если не указан, создается при первом запросе
+            db: Объект базы данных
+            ttl: Время жизни новостей в кэше в секундах
+            sources_ttl: Время жизни списков источников в кэше в секундах
+            demand_window: Время, в течение которого раздел считается востребованным, в секундах
+        """
+        self._news_api = news_api
+        self.db = db or Database()
+        self.demand_window = demand_window
+        self._cache = TTLCache(maxsize=512, ttl=ttl)
+        self._sources_cache = TTLCache(maxsize=512, ttl=sources_ttl)
+        self._demand: Dict[PartitionKey, float] = {}
+        self._inflight: Dict[UpstreamKey, asyncio.Future] = {}
+
+    @property
+    def news_api(self) -> NewsAPIClient:
+        """Клиент NewsAPI, создаваемый при первом обращении."""
+        if self._news_api is None:
+            self._news_api = NewsAPIClient()
+        return self._news_api
+
+    async def get_headlines(
+        self,
+        country: str,
+        language: str,
+        category: Optional[str] = None
+    ) -> List[Article]:
+        """Получение главных новостей раздела из кэша или NewsAPI.
+
+        Args:
+            country: Код страны
+            language: Код языка
+            category: Категория новостей
+
+        Returns:
+            Список новостных статей
+        """
+        partition = (country, language, category)
+        self._demand[partition] = time.monotonic()
+
+        upstream = await self._resolve(partition)
+        if upstream is None:
+            return []
+
+        key, fetch = upstream
+        articles = self._cache.get(key)
+        if articles is not None:
+            return articles
+
+        return await self._fetch(key, fetch, partition)
+
+    def demanded_partitions(self) -> List[PartitionKey]:
+        """Получение списка востребованных разделов.
+
+        Разделы, которые не запрашивались дольше demand_window, забываются.
+
+        Returns:
+            Список ключей разделов
+        """
+        threshold = time.monotonic() - self.demand_window
+        self._demand = {key: ts for key, ts in self._demand.items() if ts >= threshold}
+        return list(self._demand)
+
+    async def refresh(self) -> int:
+        """Обновление всех востребованных разделов.
+
+        Каждый запрос к NewsAPI выполняется не больше одного раза за проход.
+        Запросы помечаются как фоновые, чтобы запись трафика их отличала.
+
+        Returns:
+            Количество выполненных запросов к NewsAPI
+        """
+        refreshed: Set[UpstreamKey] = set()
+        token = background_request.set(True)
+
+        try:
+            for partition in self.demanded_partitions():
+                try:
+                    upstream = await self._resolve(partition)
+                    if upstream is None or upstream[0] in refreshed:
+                        continue
+
+                    key, fetch = upstream
+                    await self._fetch(key, fetch, partition)
+                    refreshed.add(key)
+                except Exception as e:
+                    logger.warning("Не удалось обновить раздел {}: {}", partition, str(e))
+        finally:
+            background_request.reset(token)
+
+        logger.debug("Обновлено запросов кэша новостей: {}", len(refreshed))
+        return len(refreshed)
+
+    async def run_forever(self, interval: float = 300.0) -> None:
+        """Периодическое обновление востребованных разделов до отмены задачи.
+
+        Args:
+            interval: Пауза между обновлениями в секундах. Должна быть меньше ttl
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh()
+
+    async def _resolve(
+        self,
+        partition: PartitionKey
+    ) -> Optional[Tuple[UpstreamKey, Callable[[], Awaitable[List[Article]]]]]:
+        """Выбор запроса к NewsAPI для раздела.
+
+        Args:
+            partition: Ключ раздела
+
+        Returns:
+            Кортеж (ключ запроса, функция запроса) или None, если у страны
+            нет источников на выбранном языке
+        """
+        country, language, category = partition
+
+        if COUNTRY_LANGUAGES.get(country, language) == language:
+            async def fetch_country() -> List[Article]:
+                return await self.news_api.get_top_headlines(category=category, country=country)
+
+            return ("country", country, category), fetch_country
+
+        sources = self._sources_cache.get(partition)
+        if sources is None:
+            sources = tuple(sorted(await self.news_api.get_sources(country, language, category)))
+            self._sources_cache.set(partition, sources)
+
+        if not sources:
+            return None
+
+        async def fetch_sources() -> List[Article]:
+            return await self.news_api.get_top_headlines(sources=list(sources))
+
+        return ("sources",) + sources, fetch_sources
+
+    async def _fetch(
+        self,
+        key: UpstreamKey,
+        fetch: Callable[[], Awaitable[List[Article]]],
+        partition: PartitionKey
+    ) -> List[Article]:
+        """Запрос к NewsAPI с объединением одновременных одинаковых запросов.
+
+        Args:
+            key: Ключ запроса
+            fetch: Функция запроса
+            partition: Раздел, к которому относятся полученные статьи
+
+        Returns:
+            Список новостных статей
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            articles = await fetch()
+            self._cache.set(key, articles)
+            future.set_result(articles)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Помечаем ошибку полученной, даже если других ожидающих запросов нет
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        country, language, category = partition
+        try:
+            await self.db.save_articles(articles, category=category, country=country, language=language)
+        except Exception as e:
+            logger.warning("Не удалось сохранить статьи в хранилище: {}", str(e))
+
+        return articles
+
+
+_prefetcher: Optional[HeadlinesPrefetcher] = None
+
+
+def get_prefetcher() -> HeadlinesPrefetcher:
+    """Получение общего для всего бота кэша главных новостей.
+
+    Returns:
+        Объект HeadlinesPrefetcher
+    """
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = HeadlinesPrefetcher()
+    return _prefetcher
@@ -0,0 +1,257 @@
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+from telegram import Update
+from telegram.ext import ContextTypes
+from loguru import logger
+
+from src.utils.news_api import NewsAPIClient, background_request
+
+
+# Поля с персональными данными, значения которых заменяются при записи
+REDACTED_FIELDS = {"first_name", "last_name", "username", "phone_number", "email", "bio", "vcard"}
+
+# Объекты, идентификаторы которых заменяются псевдонимами. Пользователи и чаты
+# в других полях распознаются по полю is_bot или типу чата
+PSEUDONYMIZED_OBJECTS = {"from", "chat", "user", "sender_chat", "from_user"}
+
+# Типы чатов Telegram
+CHAT_TYPES = {"private", "group", "supergroup", "channel"}
+
+# Поля, содержащие идентификатор пользователя или чата вне его объекта
+PSEUDONYMIZED_ID_FIELDS = {
+    "user_id", "chat_id", "user_chat_id", "sender_chat_id", "migrate_to_chat_id", "migrate_from_chat_id"
+}
+
+# Объекты, которые удаляются из записи целиком
+DROPPED_FIELDS = {"contact", "location", "venue", "photo", "document", "voice", "video"}
+
+# Текст сообщений, который записывается только для команд пользователей
+TEXT_FIELDS = {"text", "caption"}
+
+# Разметка текста, которая удаляется вместе с текстом
+ENTITY_FIELDS = {"entities", "caption_entities"}
+
+# Количество записей между сбросами буфера файла на диск
+FLUSH_EVERY = 20
+
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Построение ключа запроса к NewsAPI без API ключа.
+
+    Args:
+        endpoint: Конечная точка API
+        params: Параметры запроса
+
+    Returns:
+        Строковый ключ запроса
+    """
+    public_params = {k: v for k, v in params.items() if k != "apiKey"}
+    return f"{endpoint}?{json.dumps(public_params, sort_keys=True, ensure_ascii=False)}"
+
+
+def _run_path(path: str) -> str:
+    """Путь к файлу записи текущего запуска.
+
+    К имени файла добавляются время запуска и PID процесса, например
+    data/traffic.jsonl.gz -> data/traffic-20240101-120000-1234.jsonl.gz.
+
+    Args:
+        path: Путь из TRAFFIC_RECORD_PATH
+
+    Returns:
+        Путь к файлу записи
+    """
+    base, extension = path, ""
+    for suffix in (".jsonl.gz", ".gz"):
+        if path.endswith(suffix):
+            base, extension = path[:-len(suffix)], suffix
+            break
+
+    return f"{base}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}{extension}"
+
+
+def patch_make_request(
+    wrapper: Callable[[Callable, NewsAPIClient, str, Dict[str, Any]], Any]
+) -> Callable[[], None]:
+    """Подмена метода NewsAPIClient._make_request для записи или воспроизведения ответов.
+
+    Args:
+        wrapper: Корутина (исходный метод, клиент, конечная точка, параметры, **kwargs) -> результаты
+
+    Returns:
+        Функция, восстанавливающая исходный метод
+    """
+    original = NewsAPIClient._make_request
+
+    async def patched(client: NewsAPIClient, endpoint: str, params: Dict[str, Any],
+                      **kwargs: Any) -> List[Dict[str, Any]]:
+        return await wrapper(original, client, endpoint, params, **kwargs)
+
+    NewsAPIClient._make_request = patched
+
+    def restore() -> None:
+        NewsAPIClient._make_request = original
+
+    return restore
+
+
+class TrafficRecorder:
+    """Запись входящих обновлений Telegram и ответов NewsAPI в сжатый файл.
+
+    Файл содержит JSON-строки двух типов: "update" с обезличенным обновлением
+    и "response" с ответом NewsAPI. Ответы на фоновые запросы кэша новостей
+    помечаются полем "background". API ключ и персональные данные не записываются:
+    текст и подписи сообщений сохраняются только для команд пользователей
+    (их аргументы нужны обработчикам), остальной текст, включая сообщения
+    бота с именами пользователей, заменяется.
+
+    Текст инлайн-запросов вводится пользователем свободно и может содержать
+    персональные данные, поэтому по умолчанию заменяется. Для профилирования
+    полнотекстового поиска на реальных запросах его запись включается
+    параметром record_inline_queries.
+
+    Каждый запуск пишет отдельный файл, поэтому сбой одного запуска не портит
+    другие записи, а псевдонимы постоянны в пределах файла.
+    """
+
+    def __init__(self, path: str, record_inline_queries: bool = False):
+        """Инициализация записи.
+
+        Args:
+            path: Путь к файлу записи (gzip, JSON Lines). К имени добавляется время запуска
+            record_inline_queries: Записывать текст инлайн-запросов
+        """
+        self.path = _run_path(path)
+        self.record_inline_queries = record_inline_queries
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Случайная соль делает псевдонимы необратимыми, но постоянными в пределах записи
+        self._salt = os.urandom(16)
+        self._file = gzip.open(self.path, "xt", encoding="utf-8")
+        self._pending = 0
+        self._restore: Optional[Callable[[], None]] = None
+
+    def install(self) -> None:
+        """Включение записи ответов NewsAPI."""
+        if self._restore is None:
+            self._restore = patch_make_request(self._record_request)
+
+    async def record_update_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Обработчик, записывающий каждое входящее обновление."""
+        self.record_update(update.to_dict())
+
+    def record_update(self, data: Dict[str, Any]) -> None:
+        """Запись обновления Telegram.
+
+        Args:
+            data: Обновление в виде словаря
+        """
+        self._write({"type": "update", "ts": time.time(), "data": self.redact(data)})
+
+    def record_response(self, endpoint: str, params: Dict[str, Any], articles: List[Dict[str, Any]]) -> None:
+        """Запись ответа NewsAPI.
+
+        Args:
+            endpoint: Конечная точка API
+            params: Параметры запроса
+            articles: Список статей из ответа API
+        """
+        self._write({
+            "type": "response",
+            "ts": time.time(),
+            "key": request_key(endpoint, params),
+            "background": background_request.get(),
+            "articles": articles
+        })
+
+    def redact(self, value: Any, parent: Optional[str] = None) -> Any:
+        """Удаление персональных данных из обновления.
+
+        Args:
+            value: Обновление или его часть
+            parent: Имя поля, в котором находится значение
+
+        Returns:
+            Обезличенная копия значения
+        """
+        if isinstance(value, list):
+            return [self.redact(item, parent) for item in value]
+
+        if not isinstance(value, dict):
+            return value
+
+        keep_text = self._is_user_command(value)
+        identity = parent in PSEUDONYMIZED_OBJECTS or "is_bot" in value or value.get("type") in CHAT_TYPES
+        result = {}
+        for key, item in value.items():
+            if key in DROPPED_FIELDS or (key in ENTITY_FIELDS and not keep_text):
+                continue
+            if isinstance(item, str) and (
+                key in REDACTED_FIELDS
+                or (key in TEXT_FIELDS and not keep_text)
+                or (key == "title" and identity)
+                or (key == "query" and not self.record_inline_queries)
+            ):
+                result[key] = "redacted"
+            elif isinstance(item, int) and not isinstance(item, bool) and (
+                (key == "id" and identity) or key in PSEUDONYMIZED_ID_FIELDS
+            ):
+                result[key] = self._pseudonymize(item)
+            else:
+                result[key] = self.redact(item, key)
+        return result
+
+    def close(self) -> None:
+        """Выключение записи и закрытие файла."""
+        if self._restore is not None:
+            self._restore()
+            self._restore = None
+        self._file.close()
+        logger.info("Запись трафика сохранена в {}", self.path)
+
+    async def _record_request(
+        self,
+        original: Callable,
+        client: NewsAPIClient,
+        endpoint: str,
+        params: Dict[str, Any],
+        **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        """Выполнение запроса к NewsAPI с записью ответа."""
+        articles = await original(client, endpoint, params, **kwargs)
+        self.record_response(endpoint, params, articles)
+        return articles
+
+    @staticmethod
+    def _is_user_command(message: Dict[str, Any]) -> bool:
+        """Проверка, что объект является командой, отправленной пользователем."""
+        sender = message.get("from")
+        text = message.get("text")
+        return (
+            isinstance(sender, dict) and not sender.get("is_bot")
+            and isinstance(text, str) and text.startswith("/")
+        )
+
+    def _pseudonymize(self, identifier: int) -> int:
+        """Замена идентификатора постоянным псевдонимом с сохранением знака."""
+        digest = hmac.new(self._salt, str(abs(identifier)).encode(), hashlib.sha256).digest()
+        pseudonym = int.from_bytes(digest[:4], "big") % (2 ** 31 - 1) + 1
+        return -pseudonym if identifier < 0 else pseudonym
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Запись одной строки в файл."""
+        try:
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._pending += 1
+            if self._pending >= FLUSH_EVERY:
+                self._file.flush()
+                self._pending = 0
+        except Exception as e:
+            logger.warning("Не удалось записать трафик: {}", str(e))
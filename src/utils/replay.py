@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import cProfile
+import gzip
+import io
+import json
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from telegram import Update
+from telegram.ext import Application, ContextTypes
+from telegram.request import BaseRequest, RequestData
+from loguru import logger
+
+from src.utils.news_api import NewsAPIClient
+from src.utils.recorder import patch_make_request, request_key
+
+
+# Количество строк в отчетах по функциям и местам выделения памяти
+REPORT_TOP = 20
+
+
+def load_recording(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, List[List[Dict[str, Any]]]]]:
+    """Чтение файла записи трафика.
+
+    Ответы на фоновые запросы кэша новостей пропускаются: при воспроизведении
+    их не запрашивает ни один обработчик. Файл, оборванный при сбое бота,
+    читается до последней целой строки.
+
+    Args:
+        path: Путь к файлу записи
+
+    Returns:
+        Кортеж (список обновлений, словарь ключ запроса -> ответы NewsAPI в порядке записи)
+    """
+    updates = []
+    responses: Dict[str, List[List[Dict[str, Any]]]] = defaultdict(list)
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Запись {} оборвана на строке {}", path, number)
+                    break
+                if record["type"] == "update":
+                    updates.append(record["data"])
+                elif record["type"] == "response" and not record.get("background"):
+                    responses[record["key"]].append(record["articles"])
+    except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+        logger.warning("Запись {} оборвана: {}", path, str(e))
+
+    return updates, responses
+
+
+class _RecordedNewsAPI:
+    """Замена запросов к NewsAPI записанными ответами."""
+
+    def __init__(self, responses: Dict[str, List[List[Dict[str, Any]]]]):
+        self._responses = responses
+        self._positions: Counter = Counter()
+
+    async def __call__(
+        self,
+        original: Callable,
+        client: NewsAPIClient,
+        endpoint: str,
+        params: Dict[str, Any],
+        **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        key = request_key(endpoint, params)
+        recorded = self._responses.get(key)
+        if not recorded:
+            raise Exception(f"Нет записанного ответа для запроса {key}")
+
+        # Ответы выдаются в порядке записи, последний повторяется
+        position = min(self._positions[key], len(recorded) - 1)
+        self._positions[key] += 1
+        return recorded[position]
+
+
+class _ReplayRequest(BaseRequest):
+    """Заглушка Bot API, возвращающая успешные ответы без обращения к сети."""
+
+    def __init__(self):
+        self._message_id = 0
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None,
+                         *args: Any, **kwargs: Any) -> Tuple[int, bytes]:
+        bot_method = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+
+        if bot_method == "getMe":
+            result: Any = {"id": 1, "is_bot": True, "first_name": "NewsPulseBot", "username": "newspulsebot"}
+        elif "chat_id" in params and (bot_method.startswith("send") or bot_method.startswith("edit")):
+            self._message_id += 1
+            result = {
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": params["chat_id"], "type": "private"},
+                "text": params.get("text", "")
+            }
+        else:
+            result = True
+
+        return 200, json.dumps({"ok": True, "result": result}).encode("utf-8")
+
+
+class _InlineExecutor(ThreadPoolExecutor):
+    """Исполнитель, выполняющий задачи сразу в текущем потоке.
+
+    Запросы к базе данных выполняются через run_in_executor; при воспроизведении
+    они попадают в профиль только если выполняются в потоке обработчика.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class HandlerProfiler:
+    """Сбор времени выполнения, профиля CPU и выделений памяти по обработчикам."""
+
+    def __init__(self, profile: bool = True, trace_memory: bool = False):
+        """Инициализация профилировщика.
+
+        Args:
+            profile: Собирать профиль CPU через cProfile
+            trace_memory: Собирать выделения памяти через tracemalloc
+        """
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.allocations: Dict[str, Counter] = defaultdict(Counter)
+
+    def wrap(self, name: str, callback: Callable) -> Callable:
+        """Обертка обработчика для сбора статистики.
+
+        Args:
+            name: Имя обработчика в отчете
+            callback: Исходный обработчик
+
+        Returns:
+            Обработчик со сбором статистики
+        """
+        async def profiled(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Any:
+            profiler = self.profiles.setdefault(name, cProfile.Profile()) if self.profile else None
+            snapshot = self._take_snapshot() if self.trace_memory else None
+            started = time.perf_counter()
+
+            if profiler:
+                profiler.enable()
+            try:
+                return await callback(update, context)
+            finally:
+                if profiler:
+                    profiler.disable()
+                self.durations[name].append(time.perf_counter() - started)
+
+                if snapshot is not None:
+                    for stat in self._take_snapshot().compare_to(snapshot, "lineno"):
+                        if stat.size_diff > 0:
+                            frame = stat.traceback[0]
+                            self.allocations[name][f"{frame.filename}:{frame.lineno}"] += stat.size_diff
+
+        return profiled
+
+    def write_reports(self, output_dir: str) -> str:
+        """Сохранение отчетов по обработчикам.
+
+        Для каждого обработчика сохраняется файл <имя>.prof для pstats/snakeviz,
+        сводный отчет записывается в report.txt.
+
+        Args:
+            output_dir: Директория для отчетов
+
+        Returns:
+            Текст сводного отчета
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        report = io.StringIO()
+
+        report.write(f"{'Обработчик':<28}{'Вызовов':>10}{'Всего, мс':>14}{'Среднее, мс':>14}{'Макс., мс':>14}\n")
+        for name, durations in sorted(self.durations.items(), key=lambda item: -sum(item[1])):
+            report.write(
+                f"{name:<28}{len(durations):>10}{sum(durations) * 1000:>14.1f}"
+                f"{sum(durations) / len(durations) * 1000:>14.2f}{max(durations) * 1000:>14.2f}\n"
+            )
+
+        for name in sorted(self.durations):
+            report.write(f"\n===== {name} =====\n")
+
+            profiler = self.profiles.get(name)
+            if profiler:
+                profiler.dump_stats(os.path.join(output_dir, f"{name}.prof"))
+                stats = pstats.Stats(profiler, stream=report)
+                stats.sort_stats("cumulative").print_stats(r"src[\\/](?!utils[\\/]replay)", REPORT_TOP)
+
+            allocations = self.allocations.get(name)
+            if allocations:
+                report.write("Выделения памяти (байт):\n")
+                for location, size in allocations.most_common(REPORT_TOP):
+                    report.write(f"{size:>14}  {location}\n")
+
+        text = report.getvalue()
+        with open(os.path.join(output_dir, "report.txt"), "w", encoding="utf-8") as file:
+            file.write(text)
+
+        return text
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """Снимок памяти без выделений самого tracemalloc."""
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+
+
+async def replay(
+    path: str,
+    profile: bool = True,
+    trace_memory: bool = False
+) -> HandlerProfiler:
+    """Воспроизведение записанных обновлений через Application.process_update.
+
+    Обращения к NewsAPI заменяются записанными ответами, обращения к Bot API
+    заглушкой. Обновления обрабатываются строго по очереди.
+
+    Args:
+        path: Путь к файлу записи
+        profile: Собирать профиль CPU через cProfile
+        trace_memory: Собирать выделения памяти через tracemalloc
+
+    Returns:
+        Профилировщик с собранной статистикой
+    """
+    # Импорт здесь, чтобы обработчики создавали базу данных уже с путем из окружения
+    from src.bot import register_handlers
+
+    updates, responses = load_recording(path)
+    logger.info("Загружено обновлений: {}, ответов NewsAPI: {}", len(updates), sum(map(len, responses.values())))
+
+    asyncio.get_running_loop().set_default_executor(_InlineExecutor())
+    restore = patch_make_request(_RecordedNewsAPI(responses))
+
+    application = (
+        Application.builder()
+        .token("replay")
+        .request(_ReplayRequest())
+        .get_updates_request(_ReplayRequest())
+        .build()
+    )
+    register_handlers(application)
+
+    profiler = HandlerProfiler(profile=profile, trace_memory=trace_memory)
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            # Неблокирующие обработчики сделали бы порядок и замеры недетерминированными
+            handler.block = True
+            handler.callback = profiler.wrap(handler.callback.__name__, handler.callback)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        await application.initialize()
+        for data in updates:
+            await application.process_update(Update.de_json(data, application.bot))
+        await application.shutdown()
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        restore()
+
+    return profiler
+
+
+def main() -> None:
+    """Запуск воспроизведения из командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Воспроизведение записанного трафика бота с профилированием обработчиков"
+    )
+    parser.add_argument("recording", help="Файл записи трафика (TRAFFIC_RECORD_PATH)")
+    parser.add_argument("--output", default="profiles", help="Директория для отчетов")
+    parser.add_argument("--no-profile", action="store_true", help="Не собирать профиль CPU")
+    parser.add_argument("--trace-memory", action="store_true", help="Собирать выделения памяти")
+    parser.add_argument("--database", help="База данных для воспроизведения (по умолчанию временная)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_PATH"] = args.database or os.path.join(tempfile.mkdtemp(), "replay.db")
+    os.environ.setdefault("NEWS_API_KEY", "replay")
+
+    profiler = asyncio.run(replay(
+        args.recording,
+        profile=not args.no_profile,
+        trace_memory=args.trace_memory
+    ))
+    print(profiler.write_reports(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.database.db import Database
+from src.utils.enrichment import ArticleEnricher, extract_summary
+from src.utils.news_api import Article
+
+
+PARAGRAPHS = (
+    "<p>Компания Apple представила новый процессор для ноутбуков на конференции.</p>"
+    "<p>Новый процессор Apple работает быстрее предыдущего поколения процессоров. "
+    "Аналитики считают, что процессор изменит рынок ноутбуков.</p>"
+)
+
+# Страница больше одного сетевого буфера: текст статьи находится после длинного скрипта
+LARGE_PAGE = (
+    '<html><head><meta name="description" content="Описание из meta">'
+    f"<script>{'x' * 200_000}</script></head>"
+    f"<body><article>{PARAGRAPHS}</article></body></html>"
+)
+
+
+async def _large_page(request: web.Request) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+    await response.prepare(request)
+
+    body = LARGE_PAGE.encode("utf-8")
+    for start in range(0, len(body), 8192):
+        await response.write(body[start:start + 8192])
+        await asyncio.sleep(0)
+
+    await response.write_eof()
+    return response
+
+
+async def _missing_page(request: web.Request) -> web.Response:
+    return web.Response(status=404)
+
+
+async def _small_page(request: web.Request) -> web.Response:
+    return web.Response(text=f"<html><body>{PARAGRAPHS}</body></html>", content_type="text/html")
+
+
+async def _slow_page(request: web.Request) -> web.Response:
+    await asyncio.sleep(0.6)
+    return await _small_page(request)
+
+
+def _fixture_app(hits: list) -> web.Application:
+    async def record_hit(request: web.Request, handler):
+        hits.append((request.path, time.monotonic()))
+        return await handler(request)
+
+    app = web.Application(middlewares=[web.middleware(record_hit)])
+    app.router.add_get("/large", _large_page)
+    app.router.add_get("/missing", _missing_page)
+    app.router.add_get("/page/{n}", _small_page)
+    app.router.add_get("/slow", _slow_page)
+    return app
+
+
+async def _run(tmp_path, paths, runs=1, **enricher_options):
+    hits = []
+    server = TestServer(_fixture_app(hits))
+    await server.start_server()
+
+    db = Database(str(tmp_path / "test.db"))
+    await db.save_articles([
+        Article(source="Fixture", title=path, url=str(server.make_url(path)), published_at="2024-01-01")
+        for path in paths
+    ])
+
+    enricher = ArticleEnricher(db=db, **enricher_options)
+    try:
+        enriched = [await enricher.run_once() for _ in range(runs)]
+    finally:
+        enricher.close()
+        await server.close()
+
+    rows = await db.fetch_all("SELECT url, summary, enrichment_attempts FROM articles ORDER BY url")
+    return enriched, rows, hits
+
+
+def test_extract_summary_prefers_paragraph_text():
+    """Краткое содержание строится из текста абзацев, а не из meta-описания."""
+    summary = extract_summary(LARGE_PAGE, max_sentences=2)
+
+    assert summary.startswith("Компания Apple представила новый процессор")
+    assert "Описание из meta" not in summary
+
+
+def test_run_once_reads_whole_page(tmp_path):
+    """Страница, пришедшая несколькими блоками, читается целиком."""
+    enriched, rows, _ = asyncio.run(_run(tmp_path, ["/large"], domain_interval=0))
+
+    assert enriched == [1]
+    assert "процессор" in rows[0]["summary"]
+    assert rows[0]["enrichment_attempts"] == 1
+
+
+def test_failed_pages_are_retried_up_to_max_attempts(tmp_path):
+    """Неудачные статьи повторяются, пока не исчерпан лимит попыток."""
+    enriched, rows, hits = asyncio.run(
+        _run(tmp_path, ["/missing"], runs=3, domain_interval=0, max_attempts=2, retry_delay=0)
+    )
+
+    assert enriched == [0, 0, 0]
+    assert rows[0]["summary"] is None
+    assert rows[0]["enrichment_attempts"] == 2
+    assert len(hits) == 2
+
+
+def test_failed_pages_wait_before_retry(tmp_path):
+    """Неудачная статья не повторяется раньше паузы, даже если проходы идут подряд."""
+    enriched, rows, hits = asyncio.run(
+        _run(tmp_path, ["/missing", "/page/1"], runs=2, domain_interval=0, retry_delay=3600)
+    )
+
+    assert enriched == [1, 0]
+    assert [row["enrichment_attempts"] for row in rows] == [1, 1]
+    assert sorted(path for path, _ in hits) == ["/missing", "/page/1"]
+
+
+def test_requests_to_one_domain_are_spaced(tmp_path):
+    """Запросы к одному домену выполняются не чаще заданного интервала.
+
+    Статей больше, чем одновременных загрузок, а первая загрузка медленная:
+    запросы, ждущие свободного слота, тоже не должны уходить разом.
+    """
+    enriched, _, hits = asyncio.run(
+        _run(tmp_path, ["/slow", "/page/1", "/page/2", "/page/3"], domain_interval=0.2, concurrency=1)
+    )
+
+    timestamps = sorted(timestamp for _, timestamp in hits)
+    assert enriched == [4]
+    assert len(timestamps) == 4
+    assert all(later - earlier >= 0.19 for earlier, later in zip(timestamps, timestamps[1:]))
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.database.db import Database
+from src.handlers import inline
+from src.utils.cache import TTLCache
+from src.utils.news_api import Article
+
+
+# Целевое время ответа на инлайн-запрос для 99% запросов, в секундах
+P99_TARGET = 0.05
+
+
+class FakeInlineQuery:
+    """Инлайн-запрос, запоминающий отправленные ответы."""
+
+    def __init__(self, query, user_id=1):
+        self.query = query
+        self.from_user = SimpleNamespace(id=user_id)
+        self.answers = []
+
+    async def answer(self, results, **kwargs):
+        self.answers.append(results)
+
+
+class CountingDatabase:
+    """База данных, считающая поисковые запросы и задерживающая их до сигнала."""
+
+    def __init__(self, articles=()):
+        self.articles = list(articles)
+        self.searches = []
+        self.release = None
+
+    async def get_user_preferences(self, user_id):
+        return None
+
+    async def search_articles(self, query, **kwargs):
+        self.searches.append(query)
+        if self.release is not None:
+            await self.release.wait()
+        return self.articles
+
+
+def _article(number, title, url=None):
+    return Article(
+        source="Fixture",
+        title=title,
+        description=f"Описание статьи {number}",
+        url=url or f"https://example.com/{number}",
+        published_at=f"2024-01-01T00:{number // 60 % 60:02d}:{number % 60:02d}Z"
+    )
+
+
+def _use_database(monkeypatch, db):
+    monkeypatch.setattr(inline, "_db", db)
+    monkeypatch.setattr(inline, "_results_cache", TTLCache(maxsize=2048, ttl=60))
+
+
+def _answer(query):
+    asyncio.run(inline.inline_query_handler(SimpleNamespace(inline_query=query), None))
+
+
+def test_match_expression_uses_word_prefixes():
+    """Запрос превращается в поиск по префиксам слов без синтаксиса FTS5."""
+    build = Database._build_match_expression
+
+    assert build("Пут  ЗАЯВ") == '"пут"* "заяв"*'
+    assert build('apple" OR title:*') == '"apple"* "or"* "title"*'
+    assert build("  !? ") == ""
+
+
+def test_search_matches_word_prefixes(tmp_path):
+    """Статьи находятся по началу слов заголовка и описания."""
+    db = Database(str(tmp_path / "test.db"))
+
+    async def scenario():
+        await db.save_articles([
+            _article(1, "Путин заявил о новых мерах"),
+            _article(2, "Apple представила процессор")
+        ])
+        return (
+            await db.search_articles("пут зая"),
+            await db.search_articles("процес"),
+            await db.search_articles("утин")
+        )
+
+    by_title, by_word, by_middle = asyncio.run(scenario())
+
+    assert [a.url for a in by_title] == ["https://example.com/1"]
+    assert [a.url for a in by_word] == ["https://example.com/2"]
+    assert by_middle == []
+
+
+def test_inline_result_escapes_markdown():
+    """Символы разметки в заголовке, источнике и ссылке не ломают сообщение."""
+    article = Article(
+        source="[Fixture]",
+        title="Цена *акций* выросла на 5_%",
+        url="https://example.com/a_(b)",
+        published_at="2024-01-01"
+    )
+
+    content = inline.build_inline_result(article).input_message_content
+
+    assert content.parse_mode == "Markdown"
+    assert content.message_text == (
+        "[Цена \\*акций\\* выросла на 5\\_%](https://example.com/a_(b%29)\n🗞️ \\[Fixture]"
+    )
+
+
+def test_repeated_query_is_answered_from_cache(monkeypatch):
+    """Одинаковые запросы после нормализации ищутся в базе один раз."""
+    db = CountingDatabase([_article(1, "Путин заявил")])
+    _use_database(monkeypatch, db)
+
+    first, second = FakeInlineQuery("Путин"), FakeInlineQuery("  путин ")
+    _answer(first)
+    _answer(second)
+
+    assert db.searches == ["путин"]
+    assert len(first.answers[0]) == len(second.answers[0]) == 1
+
+
+def test_stale_query_is_cancelled(monkeypatch):
+    """Новый запрос пользователя отменяет его предыдущий незавершенный запрос."""
+    db = CountingDatabase([_article(1, "Путин заявил")])
+    _use_database(monkeypatch, db)
+    stale, fresh = FakeInlineQuery("пу"), FakeInlineQuery("пут")
+
+    async def scenario():
+        db.release = asyncio.Event()
+        stale_task = asyncio.create_task(inline.inline_query_handler(SimpleNamespace(inline_query=stale), None))
+        await asyncio.sleep(0)
+
+        fresh_task = asyncio.create_task(inline.inline_query_handler(SimpleNamespace(inline_query=fresh), None))
+        await asyncio.sleep(0)
+        db.release.set()
+
+        await asyncio.gather(stale_task, fresh_task, return_exceptions=True)
+        return stale_task
+
+    stale_task = asyncio.run(scenario())
+
+    assert stale_task.cancelled()
+    assert stale.answers == []
+    assert len(fresh.answers) == 1
+    assert inline._pending_queries == {}
+
+
+def test_inline_query_p99_latency(tmp_path, monkeypatch):
+    """99% инлайн-запросов к хранилищу из нескольких тысяч статей укладываются в 50 мс."""
+    db = Database(str(tmp_path / "test.db"))
+    words = ["выборы", "экономика", "процессор", "футбол", "погода", "рынок", "нефть", "космос"]
+    asyncio.run(db.save_articles([
+        _article(number, f"{words[number % 8]} {words[number * 3 % 8]} новость {number}")
+        for number in range(3000)
+    ]))
+    _use_database(monkeypatch, db)
+
+    queries = [
+        FakeInlineQuery(f"{words[number]} {words[number * 3 % 8][:length]}")
+        for number in range(8) for length in range(1, 6)
+    ] + [
+        FakeInlineQuery(f"{word[:length]} нов")
+        for word in words for length in range(1, 6)
+    ]
+    latencies = []
+
+    async def scenario():
+        for query in queries:
+            started = time.perf_counter()
+            await inline.inline_query_handler(SimpleNamespace(inline_query=query), None)
+            latencies.append(time.perf_counter() - started)
+
+    asyncio.run(scenario())
+
+    latencies.sort()
+    assert all(len(query.answers) == 1 and query.answers[0] for query in queries)
+    assert latencies[int(len(latencies) * 0.99) - 1] < P99_TARGET
@@ -0,0 +1,86 @@
+import asyncio
+
+from src.database.db import Database
+from src.utils.news_api import Article
+from src.utils.prefetch import HeadlinesPrefetcher
+
+
+class FakeNewsAPI:
+    """NewsAPI без сети: запоминает запросы и возвращает статьи по ним."""
+
+    def __init__(self, articles=None):
+        self.calls = []
+        self.articles = articles or {}
+
+    async def get_top_headlines(self, category=None, country="ru", page_size=5, sources=None):
+        key = ("sources", tuple(sources)) if sources else ("country", country, category)
+        self.calls.append(key)
+        await asyncio.sleep(0.01)
+        return self.articles.get(key, [])
+
+    async def get_sources(self, country, language, category=None):
+        self.calls.append(("sources-list", country, language, category))
+        return {("ru", "en"): ["rt-en"]}.get((country, language), [])
+
+
+def _article(url, title):
+    return Article(source="Fixture", title=title, url=url, published_at="2024-01-01")
+
+
+def test_language_is_applied_through_sources(tmp_path):
+    """Язык, отличный от языка страны, запрашивается через источники страны."""
+    news_api = FakeNewsAPI({
+        ("country", "ru", None): [_article("https://ru/1", "Путин заявил")],
+        ("sources", ("rt-en",)): [_article("https://rt/1", "Putin said")],
+    })
+    prefetcher = HeadlinesPrefetcher(news_api=news_api, db=Database(str(tmp_path / "test.db")))
+
+    async def scenario():
+        native = await prefetcher.get_headlines("ru", "ru")
+        english = await prefetcher.get_headlines("ru", "en")
+        await prefetcher.get_headlines("ru", "en")
+        return native, english
+
+    native, english = asyncio.run(scenario())
+
+    assert [a.url for a in native] == ["https://ru/1"]
+    assert [a.url for a in english] == ["https://rt/1"]
+    assert news_api.calls == [
+        ("country", "ru", None),
+        ("sources-list", "ru", "en", None),
+        ("sources", ("rt-en",)),
+    ]
+
+
+def test_concurrent_requests_share_one_upstream_call(tmp_path):
+    """Одновременные запросы одного раздела выполняют один запрос к NewsAPI."""
+    news_api = FakeNewsAPI()
+    prefetcher = HeadlinesPrefetcher(news_api=news_api, db=Database(str(tmp_path / "test.db")))
+
+    async def scenario():
+        await asyncio.gather(*(prefetcher.get_headlines("us", "en", "sports") for _ in range(5)))
+        return await prefetcher.refresh()
+
+    assert asyncio.run(scenario()) == 1
+    assert news_api.calls == [("country", "us", "sports")] * 2
+
+
+def test_article_keeps_all_partitions(tmp_path):
+    """Статья, полученная в нескольких разделах, находится поиском в каждом из них."""
+    db = Database(str(tmp_path / "test.db"))
+    article = _article("https://ru/1", "Путин заявил")
+
+    async def scenario():
+        await db.save_articles([article], country="ru", language="ru")
+        await db.save_articles([article], country="ua", language="ru")
+        return (
+            await db.search_articles("пут", country="ru", language="ru"),
+            await db.search_articles("пут", country="ua", language="ru"),
+            await db.search_articles("пут", country="ru", language="en"),
+        )
+
+    ru, ua, english = asyncio.run(scenario())
+
+    assert [a.url for a in ru] == ["https://ru/1"]
+    assert [a.url for a in ua] == ["https://ru/1"]
+    assert english == []
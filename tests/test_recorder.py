@@ -0,0 +1,156 @@
+import asyncio
+import gzip
+import json
+import os
+
+from src.utils.news_api import NewsAPIClient
+from src.utils.prefetch import HeadlinesPrefetcher
+from src.utils.recorder import FLUSH_EVERY, TrafficRecorder
+from src.utils.replay import load_recording
+
+
+USER = {"id": 12345, "is_bot": False, "first_name": "Иван", "username": "ivan"}
+BOT = {"id": 1, "is_bot": True, "first_name": "NewsPulseBot", "username": "newspulsebot"}
+CHAT = {"id": 12345, "type": "private", "first_name": "Иван"}
+
+
+def _message(sender, text, **fields):
+    return {"message_id": 1, "date": 0, "chat": CHAT, "from": sender, "text": text, **fields}
+
+
+def test_commands_are_kept_and_other_text_redacted(tmp_path):
+    """Текст команд сохраняется, текст сообщений бота и пользователей заменяется."""
+    recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl.gz"))
+    try:
+        command = recorder.redact({
+            "update_id": 1,
+            "message": _message(
+                USER, "/news sports",
+                entities=[{"type": "bot_command", "offset": 0, "length": 5}],
+                reply_to_message=_message(BOT, "Привет, Иван!")
+            )
+        })
+        callback = recorder.redact({
+            "update_id": 2,
+            "callback_query": {
+                "id": "1", "from": USER, "chat_instance": "1", "data": "category_sports",
+                "message": _message(BOT, "Привет, Иван!", entities=[{"type": "bold", "offset": 0, "length": 6}])
+            }
+        })
+        text = recorder.redact({"update_id": 3, "message": _message(USER, "мой телефон 555-12-34")})
+    finally:
+        recorder.close()
+
+    assert command["message"]["text"] == "/news sports"
+    assert command["message"]["entities"][0]["type"] == "bot_command"
+    assert command["message"]["from"]["first_name"] == "redacted"
+    assert command["message"]["from"]["id"] != USER["id"]
+    assert command["message"]["reply_to_message"]["text"] == "redacted"
+    assert callback["callback_query"]["message"]["text"] == "redacted"
+    assert "entities" not in callback["callback_query"]["message"]
+    assert callback["callback_query"]["data"] == "category_sports"
+    assert text["message"]["text"] == "redacted"
+
+
+def test_user_and_chat_ids_are_pseudonymized_everywhere(tmp_path):
+    """Идентификаторы пользователей и чатов заменяются в любых полях обновления."""
+    group = {"id": -100777, "type": "supergroup", "title": "Семья Ивановых"}
+    recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl.gz"))
+    try:
+        joined = recorder.redact({
+            "update_id": 1,
+            "message": {
+                "message_id": 1, "date": 0, "chat": group, "from": USER,
+                "new_chat_members": [USER],
+                "forward_origin": {"type": "user", "date": 0, "sender_user": USER},
+                "sender_chat_id": -100777
+            }
+        })
+        join_request = recorder.redact({
+            "update_id": 2,
+            "chat_join_request": {"chat": group, "from": USER, "user_chat_id": 12345, "date": 0}
+        })
+    finally:
+        recorder.close()
+
+    recorded = json.dumps([joined, join_request])
+    pseudonym = joined["message"]["from"]["id"]
+
+    assert "12345" not in recorded and "100777" not in recorded
+    assert "Иван" not in recorded
+    assert joined["message"]["new_chat_members"][0]["id"] == pseudonym
+    assert joined["message"]["forward_origin"]["sender_user"]["id"] == pseudonym
+    assert joined["message"]["sender_chat_id"] == joined["message"]["chat"]["id"] < 0
+    assert join_request["chat_join_request"]["user_chat_id"] == pseudonym
+
+
+def test_inline_queries_are_recorded_only_when_enabled(tmp_path):
+    """Текст инлайн-запросов по умолчанию заменяется и записывается только по явному включению."""
+    update = {"update_id": 1, "inline_query": {"id": "1", "from": USER, "query": "путин", "offset": ""}}
+
+    recorders = [
+        TrafficRecorder(str(tmp_path / "default.jsonl.gz")),
+        TrafficRecorder(str(tmp_path / "enabled.jsonl.gz"), record_inline_queries=True)
+    ]
+    try:
+        queries = [recorder.redact(update)["inline_query"]["query"] for recorder in recorders]
+    finally:
+        for recorder in recorders:
+            recorder.close()
+
+    assert queries == ["redacted", "путин"]
+
+
+def test_run_file_is_separate_and_truncated_file_is_readable(tmp_path):
+    """Запуск пишет свой файл, файл, оборванный при сбое, читается до целых строк."""
+    path = tmp_path / "traffic.jsonl.gz"
+    recorder = TrafficRecorder(str(path))
+    for update_id in range(FLUSH_EVERY + 10):
+        recorder.record_update({"update_id": update_id})
+
+    # Содержимое файла при сбое бота: сброшенные на диск записи без завершающего блока gzip
+    with open(recorder.path, "rb") as file:
+        crashed = file.read()
+    recorder.close()
+
+    crashed_path = tmp_path / "crashed.jsonl.gz"
+    crashed_path.write_bytes(crashed)
+    updates, _ = load_recording(str(crashed_path))
+
+    assert not path.exists()
+    assert os.path.basename(recorder.path).startswith("traffic-")
+    assert recorder.path.endswith(".jsonl.gz")
+    assert [update["update_id"] for update in updates] == list(range(FLUSH_EVERY))
+
+
+def test_background_responses_are_skipped(tmp_path, monkeypatch):
+    """Ответы на фоновое обновление кэша помечаются и не воспроизводятся."""
+    async def fake_request(client, endpoint, params, **kwargs):
+        return [{"title": "top"}]
+
+    class FakeDatabase:
+        async def save_articles(self, *args, **kwargs):
+            pass
+
+    monkeypatch.setenv("NEWS_API_KEY", "test")
+    monkeypatch.setattr(NewsAPIClient, "_make_request", fake_request)
+
+    recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl.gz"))
+    recorder.install()
+    prefetcher = HeadlinesPrefetcher(news_api=NewsAPIClient(), db=FakeDatabase())
+
+    async def scenario():
+        await prefetcher.get_headlines("us", "en")
+        await prefetcher.refresh()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        recorder.close()
+
+    with gzip.open(recorder.path, "rt", encoding="utf-8") as file:
+        flags = [line.count('"background":true') for line in file]
+    _, responses = load_recording(recorder.path)
+
+    assert flags == [0, 1]
+    assert sum(map(len, responses.values())) == 1
@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+from src.database.db import Database
+from src.utils import prefetch
+from src.utils.recorder import TrafficRecorder
+from src.utils.replay import replay
+
+
+USER = {"id": 12345, "is_bot": False, "first_name": "Иван"}
+CHAT = {"id": 12345, "type": "private", "first_name": "Иван"}
+
+ARTICLES = [
+    {
+        "source": {"name": "Fixture"},
+        "title": f"Новость {number}",
+        "description": "Описание",
+        "url": f"https://example.com/{number}",
+        "publishedAt": "2024-01-01T00:00:00Z"
+    }
+    for number in range(5)
+]
+
+
+def _command(update_id, text):
+    command = text.split()[0]
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 0, "chat": CHAT, "from": USER, "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        }
+    }
+
+
+def test_replay_profiles_each_handler(tmp_path, monkeypatch):
+    """Записанные обновления проходят через обработчики, ответы NewsAPI берутся из записи."""
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "replay.db"))
+    monkeypatch.setenv("NEWS_API_KEY", "replay")
+    monkeypatch.setattr(prefetch, "_prefetcher", None)
+
+    recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl.gz"))
+    recorder.record_update(_command(1, "/start"))
+    recorder.record_update(_command(2, "/news"))
+    recorder.record_update(_command(3, "/news"))
+    recorder.record_response("top-headlines", {"apiKey": "secret", "country": "ru", "pageSize": 5}, ARTICLES)
+    recorder.close()
+
+    profiler = asyncio.run(replay(recorder.path))
+    report = profiler.write_reports(str(tmp_path / "profiles"))
+    stored = asyncio.run(Database().fetch_all("SELECT url FROM articles ORDER BY url"))
+
+    assert {name: len(durations) for name, durations in profiler.durations.items()} == {
+        "start_command": 1,
+        "news_command": 2
+    }
+    assert all(duration > 0 for durations in profiler.durations.values() for duration in durations)
+    assert [row["url"] for row in stored] == [article["url"] for article in ARTICLES]
+    assert "news_command" in report
+    assert os.path.exists(tmp_path / "profiles" / "news_command.prof")